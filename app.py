@@ -1,7 +1,9 @@
+from typing import List, Optional
 import streamlit as st
-from streamlit_folium import folium_static
-from PIL import Image
+import streamlit.components.v1 as components
 from graph.core import CityGraph
+from graph.instrumentation import INSTRUMENTATION
+from graph.models import RouteResult
 from graph.visualization import visualize_graph, visualize_on_map
 from graph.algorithms import dijkstra, yen_k_shortest_paths
 from utils.helpers import initialize_sample_city, generate_route_summary
@@ -108,12 +110,69 @@ body {
     </style>
     """, unsafe_allow_html=True)
 
+# Cached renders are keyed on the route contents rather than object identity
+_ROUTE_HASH_FUNCS = {
+    RouteResult: lambda route: (tuple(route.path), tuple(route.segment_costs))
+}
+
+@st.cache_resource
+def get_city_graph() -> CityGraph:
+    """Build the city graph once per process and share it across sessions"""
+    return initialize_sample_city()
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def compute_routes(
+    _city_graph: CityGraph,
+    graph_version: int,
+    start_node: str,
+    end_node: str,
+    time_of_day: Optional[str],
+    use_case: Optional[str],
+    show_multiple_routes: bool,
+    num_routes: int
+) -> List[RouteResult]:
+    """Compute route options, memoized on the search parameters and graph version"""
+    if show_multiple_routes:
+        return yen_k_shortest_paths(
+            _city_graph, start_node, end_node, 
+            num_routes, time_of_day, use_case
+        )
+    route = dijkstra(_city_graph, start_node, end_node, time_of_day, use_case)
+    return [route] if route.path else []
+
+@st.cache_data(max_entries=64, show_spinner=False, hash_funcs=_ROUTE_HASH_FUNCS)
+def render_network_image(
+    _city_graph: CityGraph,
+    graph_version: int,
+    route: Optional[RouteResult] = None,
+    time_of_day: Optional[str] = None
+) -> bytes:
+    """Render the network image as PNG bytes, memoized on the route and graph version"""
+    return visualize_graph(_city_graph, route, time_of_day)
+
+@st.cache_data(max_entries=256, show_spinner=False, hash_funcs=_ROUTE_HASH_FUNCS)
+def render_route_map(_city_graph: CityGraph, graph_version: int, route: RouteResult) -> str:
+    """Render a route's folium map to HTML, memoized on the route and graph version"""
+    route_map = visualize_on_map(_city_graph, route)
+    with INSTRUMENTATION.timer('map.render_html'):
+        return route_map.get_root().render()
+
 def initialize_session_state():
-    """Initialize Streamlit session state"""
-    if 'city_graph' not in st.session_state:
-        st.session_state.city_graph = initialize_sample_city()
-        st.session_state.paths = None
+    """Initialize Streamlit session state
+
+    Only the search parameters are stored per session; the graph is a shared
+    cached resource and routes are looked up from the route cache.
+    """
+    if 'search_params' not in st.session_state:
         st.session_state.search_params = None
+    st.session_state.paths = _get_current_routes()
+
+def _get_current_routes() -> Optional[List[RouteResult]]:
+    """Resolve this session's last search against the current graph"""
+    if not st.session_state.search_params:
+        return None
+    city_graph = get_city_graph()
+    return compute_routes(city_graph, city_graph.version, *st.session_state.search_params)
 
 def render_sidebar():
     """Render the sidebar controls"""
@@ -146,23 +205,12 @@ def render_sidebar():
         
         if find_route:
             with st.spinner("Finding optimal routes..."):
-                if show_multiple_routes:
-                    paths = yen_k_shortest_paths(
-                        st.session_state.city_graph, start_node, end_node, 
-                        num_routes, time_of_day, use_case
-                    )
-                else:
-                    dist, path = dijkstra(
-                        st.session_state.city_graph, start_node, end_node, 
-                        time_of_day, use_case
-                    )
-                    paths = [(dist, path)] if path else []
-                
-                st.session_state.paths = paths
                 st.session_state.search_params = (
                     start_node, end_node, time_of_day, use_case,
                     show_multiple_routes, num_routes if show_multiple_routes else 1
                 )
+                paths = _get_current_routes()
+                st.session_state.paths = paths
                 
                 if not paths:
                     st.error("No path found between the selected locations")
@@ -185,25 +233,30 @@ def render_network_visualization():
     """Render the city network visualization"""
     st.markdown("<h2 class='subheader'>City Road Network</h2>", unsafe_allow_html=True)
     
+    city_graph = get_city_graph()
+    
     with st.container(border=True):
         if st.session_state.paths:
-            img = visualize_graph(
-                st.session_state.city_graph,
-                st.session_state.paths[0][1],
+            img = render_network_image(
+                city_graph,
+                city_graph.version,
+                st.session_state.paths[0],
                 st.session_state.search_params[2] if st.session_state.search_params else None
             )
             st.image(img, use_container_width=True)
         else:
-            img = visualize_graph(st.session_state.city_graph)
+            img = render_network_image(city_graph, city_graph.version)
             st.image(img, use_container_width=True)
             st.info("Select locations and click 'FIND BEST ROUTE' to see path options")
 
 def render_route_options():
     """Render the available route options"""
     paths = st.session_state.paths
+    city_graph = get_city_graph()
     st.markdown("<h2 class='subheader'>Recommended Routes</h2>", unsafe_allow_html=True)
     
-    for i, (dist, path) in enumerate(paths):
+    for i, route in enumerate(paths):
+        dist, path = route.cost, route.path
         with st.expander(f"Route Option {i+1}: {dist:.1f} minutes", expanded=(i==0)):
             with st.container(border=True):
                 st.markdown(f"""
@@ -215,11 +268,7 @@ def render_route_options():
             
             st.markdown("<p style='font-weight:600; color: black;'>🛣️ <strong>Detailed Path:</strong></p>", unsafe_allow_html=True)
             
-            for j in range(len(path)-1):
-                u = path[j]
-                v = path[j+1]
-                weight = _get_route_segment_weight(st.session_state.city_graph, u, v)
-                
+            for u, v, weight in route.segments():
                 with st.container(border=True):
                     st.markdown(f"""
                     <div style="color: black;">
@@ -234,29 +283,18 @@ def render_route_options():
                     </div>
                     """, unsafe_allow_html=True)
             
-            st.markdown("<p style='font-weight:600; color: black;'>🗺️ <strong>Map View:</strong></p>", unsafe_allow_html=True)
-            with st.container(border=True):
-                m = visualize_on_map(st.session_state.city_graph, path)
-                folium_static(m, height=250)
-
-def _get_route_segment_weight(city_graph, u, v):
-    """Get weight for a route segment considering all factors"""
-    weight = city_graph.graph[u][v]['weight']
-    
-    if st.session_state.search_params and st.session_state.search_params[2]:  # time_of_day
-        time_of_day = st.session_state.search_params[2]
-        if (u, v) in city_graph.time_weights:
-            weight = city_graph.time_weights[(u, v)][time_of_day]
-    
-    if (u, v) in city_graph.user_reports:
-        weight += city_graph.user_reports[(u, v)]
-    
-    return weight
+            # Maps are only built once the user asks for them
+            if st.toggle("🗺️ Show map view", value=(i == 0), key=f"route_map_{i}"):
+                with st.container(border=True):
+                    components.html(
+                        render_route_map(city_graph, city_graph.version, route),
+                        height=250
+                    )
 
 def render_traffic_information():
     """Render the traffic information panel"""
     st.markdown("<h2 class='subheader'>Traffic Information</h2>", unsafe_allow_html=True)
-    city_graph = st.session_state.city_graph
+    city_graph = get_city_graph()
     
     with st.expander("🚦 Live Traffic Conditions", expanded=True):
         if city_graph.traffic_alerts:
@@ -277,6 +315,32 @@ def render_traffic_information():
         if not (city_graph.traffic_alerts or city_graph.congestion_zones or city_graph.user_reports):
             st.success("✅ No current traffic issues reported")
 
+def render_debug_panel():
+    """Render the routing instrumentation debug panel"""
+    with st.sidebar.expander("🛠️ Debug: Routing Metrics"):
+        enabled = st.checkbox(
+            "Collect routing metrics",
+            value=INSTRUMENTATION.enabled,
+            help="Applies to every session served by this process"
+        )
+        if enabled != INSTRUMENTATION.enabled:
+            INSTRUMENTATION.enable() if enabled else INSTRUMENTATION.disable()
+        
+        st.caption("Cached routes and renders are not re-measured.")
+        cols = st.columns(2)
+        with cols[0]:
+            if st.button("Reset", use_container_width=True):
+                INSTRUMENTATION.reset()
+        with cols[1]:
+            st.download_button(
+                "Download JSON",
+                INSTRUMENTATION.to_json(indent=2),
+                file_name="routing_metrics.json",
+                mime="application/json",
+                use_container_width=True
+            )
+        st.json(INSTRUMENTATION.snapshot(), expanded=False)
+
 def main():
     """Main application entry point"""
     st.set_page_config(
@@ -290,6 +354,7 @@ def main():
     initialize_session_state()
     render_sidebar()
     render_main_content()
+    render_debug_panel()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,416 @@
+import argparse
+import asyncio
+import bisect
+import copy
+import json
+import math
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Dict, List, Optional
+from graph.algorithms import dijkstra, yen_k_shortest_paths
+from graph.core import CityGraph
+from utils.helpers import initialize_sample_city
+from utils.synthetic import CITY_LAYOUTS, generate_city
+from .run import TIMES_OF_DAY, USE_CASES, summarize
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+HISTOGRAM_BUCKETS_MS = [0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+EVENT_TYPES = ('route', 'report', 'congestion')
+
+def load_events(path: str) -> List[Dict]:
+    """Read a JSONL event log and return its events ordered by time
+
+    Each line is a JSON object with a `type` of route, report or congestion
+    and a `t` holding either seconds or an ISO 8601 timestamp; one log must
+    use the same form throughout:
+
+        {"t": 0.0, "type": "route", "start": "A", "end": "B", "k": 1,
+         "time_of_day": "morning", "use_case": null}
+        {"t": 1.5, "type": "report", "from": "A", "to": "C", "delay": 4}
+        {"t": 2.0, "type": "congestion", "from": "A", "to": "C", "active": true}
+    """
+    events = []
+    iso_times = None
+    with open(path) as log:
+        for number, line in enumerate(log, 1):
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+                is_iso = isinstance(event, dict) and isinstance(event.get('t'), str)
+                validate_event(event)
+                if iso_times is None:
+                    iso_times = is_iso
+                elif is_iso != iso_times:
+                    # Epoch seconds sorted among relative ones would stall the replay for decades
+                    raise ValueError("'t' mixes ISO timestamps and relative seconds")
+            except ValueError as error:
+                raise ValueError(f"{path}:{number}: {error}") from None
+            events.append(event)
+    events.sort(key=lambda event: event['t'])
+    return events
+
+def validate_event(event: Dict):
+    """Check an event's fields and normalise `t` to seconds; raises ValueError"""
+    if not isinstance(event, dict):
+        raise ValueError("event must be a JSON object")
+    if event.get('type') not in EVENT_TYPES:
+        raise ValueError(f"unknown event type {event.get('type')!r}")
+
+    t = event.get('t')
+    if isinstance(t, str):
+        event['t'] = datetime.fromisoformat(t).timestamp()
+    elif isinstance(t, (int, float)) and not isinstance(t, bool):
+        event['t'] = float(t)
+    else:
+        raise ValueError(f"'t' must be seconds or an ISO 8601 timestamp, got {t!r}")
+
+    if event['type'] == 'route':
+        required = ('start', 'end')
+        k = event.get('k', 1)
+        if not isinstance(k, int) or isinstance(k, bool) or k < 1:
+            raise ValueError(f"'k' must be a positive integer, got {k!r}")
+        if event.get('time_of_day') not in [None, *TIMES_OF_DAY]:
+            raise ValueError(f"unknown time_of_day {event.get('time_of_day')!r}")
+        if event.get('use_case') not in USE_CASES:
+            raise ValueError(f"unknown use_case {event.get('use_case')!r}")
+    else:
+        required = ('from', 'to')
+        if event['type'] == 'report':
+            delay = event.get('delay')
+            if not isinstance(delay, (int, float)) or isinstance(delay, bool):
+                raise ValueError(f"'delay' must be a number of minutes, got {delay!r}")
+            if not math.isfinite(delay) or delay < 0:
+                raise ValueError(f"'delay' must be finite and non-negative, got {delay!r}")
+        elif not isinstance(event.get('active', True), bool):
+            raise ValueError(f"'active' must be true or false, got {event.get('active')!r}")
+
+    for field in required:
+        if not isinstance(event.get(field), str):
+            raise ValueError(f"{event['type']} event needs a string {field!r}")
+
+def generate_event_log(
+    city_graph: CityGraph,
+    num_events: int,
+    duration: float,
+    seed: int = 0,
+    route_share: float = 0.8,
+    report_share: float = 0.15
+) -> List[Dict]:
+    """Build a synthetic event log with Poisson arrivals over `duration` seconds
+
+    Half of the route queries start from a small set of hot origins, one in
+    eight ask for three alternatives, and the remaining events are split
+    between user reports and congestion zones being added or lifted.
+    """
+    rng = random.Random(seed)
+    nodes = list(city_graph.graph.nodes())
+    roads = list(city_graph.graph.edges())
+    hot_origins = rng.sample(nodes, min(10, len(nodes)))
+    active_zones: List = []
+    events = []
+    t = 0.0
+
+    for _ in range(num_events):
+        t += rng.expovariate(num_events / duration)
+        roll = rng.random()
+        if roll < route_share:
+            events.append({
+                't': round(t, 4), 'type': 'route',
+                'start': rng.choice(hot_origins if rng.random() < 0.5 else nodes),
+                'end': rng.choice(nodes),
+                'k': 3 if rng.random() < 0.125 else 1,
+                'time_of_day': rng.choice(TIMES_OF_DAY),
+                'use_case': rng.choice(USE_CASES),
+            })
+        elif roll < route_share + report_share:
+            u, v = rng.choice(roads)
+            events.append({
+                't': round(t, 4), 'type': 'report', 'from': u, 'to': v,
+                'delay': round(rng.uniform(1, 3) * city_graph.graph[u][v]['weight'], 1),
+            })
+        elif active_zones and rng.random() < 0.5:
+            u, v = active_zones.pop(rng.randrange(len(active_zones)))
+            events.append({'t': round(t, 4), 'type': 'congestion', 'from': u, 'to': v, 'active': False})
+        else:
+            u, v = rng.choice(roads)
+            active_zones.append((u, v))
+            events.append({'t': round(t, 4), 'type': 'congestion', 'from': u, 'to': v, 'active': True})
+    return events
+
+class ReplayEngine:
+    """Replay an event log against a CityGraph and measure how routing keeps up
+
+    Events are dispatched at their log time divided by `rate`; a rate of 0
+    replays as fast as possible. At most `concurrency` route queries are in
+    flight on the worker pool; when they are all busy the dispatcher waits,
+    which shows up as dispatch lag. Latency runs from when a query was due,
+    or at rate 0, where nothing is ever due, from its dispatch; dispatch lag
+    is not reported at rate 0. Updates are applied on the dispatcher in
+    log order, and each search runs on a snapshot of the reports and
+    congestion zones taken when it is dispatched, so it sees exactly the
+    updates logged before it.
+    """
+
+    def __init__(self, city_graph: CityGraph, concurrency: int = 4, rate: float = 1.0):
+        self.city_graph = city_graph
+        self.concurrency = concurrency
+        self.rate = rate
+
+    def run(self, events: List[Dict]) -> Dict:
+        """Replay the events and return the collected metrics"""
+        return asyncio.run(self._replay(events))
+
+    async def _replay(self, events: List[Dict]) -> Dict:
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        slots = asyncio.Semaphore(self.concurrency)
+        # Version and time of every applied update, for staleness lookups
+        self._update_versions: List[int] = []
+        self._update_times: List[float] = []
+        self._queries: List[Dict] = []
+        updates = {'report': 0, 'congestion': 0, 'rejected': 0}
+        dispatch_lag = []
+        tasks = []
+
+        log_start = events[0]['t'] if events else 0.0
+        started = time.perf_counter()
+        for event in events:
+            due = started + ((event['t'] - log_start) / self.rate if self.rate else 0)
+            if due > time.perf_counter():
+                await asyncio.sleep(due - time.perf_counter())
+
+            if event['type'] == 'route':
+                await slots.acquire()
+                dispatched = time.perf_counter()
+                dispatch_lag.append((dispatched - due) * 1000)
+                tasks.append(self._submit_route(
+                    event, due if self.rate else dispatched, executor, slots
+                ))
+            else:
+                dispatch_lag.append((time.perf_counter() - due) * 1000)
+                if self._apply_update(event):
+                    updates[event['type']] += 1
+                else:
+                    updates['rejected'] += 1
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*tasks)
+        wall_seconds = time.perf_counter() - started
+        executor.shutdown()
+        return self._report(events, wall_seconds, updates, dispatch_lag)
+
+    def _submit_route(
+        self,
+        event: Dict,
+        since: float,
+        executor: ThreadPoolExecutor,
+        slots: asyncio.Semaphore
+    ) -> asyncio.Task:
+        """Start one route query on the worker pool and return the task recording it
+
+        The graph state and version are captured before returning, so updates
+        later in the log cannot affect the search.
+        """
+        loop = asyncio.get_running_loop()
+        city_graph = self._snapshot()
+        k = event.get('k', 1)
+        if k > 1:
+            search = partial(
+                yen_k_shortest_paths, city_graph, event['start'], event['end'],
+                k, event.get('time_of_day'), event.get('use_case')
+            )
+        else:
+            search = partial(
+                dijkstra, city_graph, event['start'], event['end'],
+                event.get('time_of_day'), event.get('use_case')
+            )
+        version = city_graph.version
+        search_started = time.perf_counter()
+        missing = [
+            node for node in (event['start'], event['end'])
+            if node not in city_graph.graph
+        ]
+        result = None if missing else loop.run_in_executor(executor, search)
+        return loop.create_task(self._record_route(
+            event, since, version, search_started, result, missing, slots
+        ))
+
+    async def _record_route(
+        self,
+        event: Dict,
+        since: float,
+        version: int,
+        search_started: float,
+        result: Optional[asyncio.Future],
+        missing: List[str],
+        slots: asyncio.Semaphore
+    ):
+        """Wait for a submitted search and record its latency from `since`"""
+        try:
+            routes, error = None, None
+            if missing:
+                error = f"unknown intersection {missing[0]!r}"
+            else:
+                try:
+                    routes = await result
+                except Exception as failure:
+                    # Recorded per query so one bad event cannot end the replay
+                    error = f"{type(failure).__name__}: {failure}"
+            finished = time.perf_counter()
+
+            self._queries.append({
+                'k': event.get('k', 1),
+                'latency_ms': (finished - since) * 1000,
+                'service_ms': (finished - search_started) * 1000,
+                'versions_behind': self.city_graph.version - version,
+                'stale_ms': self._stale_ms(version, finished),
+                'found': bool(routes),
+                'error': error,
+            })
+        finally:
+            slots.release()
+
+    def _snapshot(self) -> CityGraph:
+        """Copy of the graph sharing its roads but owning the state updates change
+
+        Replayed updates only touch reports, alerts and congestion zones, so
+        copying those keeps a running search isolated from later events.
+        """
+        snapshot = copy.copy(self.city_graph)
+        snapshot.user_reports = dict(self.city_graph.user_reports)
+        snapshot.traffic_alerts = set(self.city_graph.traffic_alerts)
+        snapshot.congestion_zones = set(self.city_graph.congestion_zones)
+        return snapshot
+
+    def _stale_ms(self, version: int, finished: float) -> Optional[float]:
+        """How long an answer computed at `version` had been out of date when it finished"""
+        first_newer = bisect.bisect_right(self._update_versions, version)
+        if first_newer == len(self._update_times):
+            return None
+        return (finished - self._update_times[first_newer]) * 1000
+
+    def _apply_update(self, event: Dict) -> bool:
+        """Apply a report or congestion event through the CityGraph API"""
+        u, v = event['from'], event['to']
+        if event['type'] == 'report':
+            applied = self.city_graph.add_user_report(u, v, float(event['delay']))
+        elif event.get('active', True):
+            applied = self.city_graph.add_congestion_zone(u, v)
+        else:
+            applied = self.city_graph.remove_congestion_zone(u, v)
+        if applied:
+            self._update_versions.append(self.city_graph.version)
+            self._update_times.append(time.perf_counter())
+        return applied
+
+    def _report(self, events: List[Dict], wall_seconds: float, updates: Dict, dispatch_lag: List[float]) -> Dict:
+        """Summarise throughput, latency and staleness of the replay"""
+        queries = self._queries
+        latencies = [query['latency_ms'] for query in queries]
+        log_span = events[-1]['t'] - events[0]['t'] if events else 0.0
+        stale = [query for query in queries if query['stale_ms'] is not None]
+        return {
+            'events': len(events),
+            'route_queries': len(queries),
+            'k_shortest_queries': sum(1 for query in queries if query['k'] > 1),
+            'no_route': sum(1 for query in queries if not query['found']),
+            'errors': sum(1 for query in queries if query['error']),
+            'error_examples': sorted({query['error'] for query in queries if query['error']})[:5],
+            'updates': updates,
+            'concurrency': self.concurrency,
+            'rate': self.rate,
+            'wall_seconds': wall_seconds,
+            'log_span_seconds': log_span,
+            'achieved_speedup': log_span / wall_seconds if wall_seconds else None,
+            'throughput_qps': len(queries) / wall_seconds if wall_seconds else None,
+            'latency_ms': summarize(latencies),
+            'latency_histogram_ms': latency_histogram(latencies),
+            'service_ms': summarize([query['service_ms'] for query in queries]),
+            'dispatch_lag_ms': summarize(dispatch_lag) if self.rate else None,
+            'staleness': {
+                'stale_fraction': len(stale) / len(queries) if queries else 0.0,
+                'max_versions_behind': max((query['versions_behind'] for query in queries), default=0),
+                'stale_ms': summarize([query['stale_ms'] for query in stale]),
+            },
+        }
+
+def latency_histogram(latencies: List[float]) -> Dict[str, int]:
+    """Count latencies into HISTOGRAM_BUCKETS_MS; a bucket includes its upper bound"""
+    labels = [f"<={bound}" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}"]
+    counts = [0] * len(labels)
+    for latency in latencies:
+        counts[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, latency)] += 1
+    return dict(zip(labels, counts))
+
+def _build_city(args) -> CityGraph:
+    """The sample city, or a synthetic one when --layout is given"""
+    if args.layout:
+        return generate_city(args.layout, args.size, args.seed)
+    return initialize_sample_city()
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point: python -m benchmarks.replay"""
+    parser = argparse.ArgumentParser(description="Replay traffic event logs against the router")
+    parser.add_argument('--layout', choices=CITY_LAYOUTS,
+                        help="Use a synthetic city instead of the sample city")
+    parser.add_argument('--size', type=int, default=1000, help="Synthetic city intersections")
+    parser.add_argument('--seed', type=int, default=0)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="Write a synthetic event log")
+    generate.add_argument('--output', default='events.jsonl')
+    generate.add_argument('--events', type=int, default=5000)
+    generate.add_argument('--duration', type=float, default=3600, help="Log span in seconds")
+
+    replay = commands.add_parser('run', help="Replay an event log")
+    replay.add_argument('log')
+    replay.add_argument('--concurrency', type=int, nargs='+', default=[4],
+                        help="One replay per concurrency level")
+    replay.add_argument('--rate', type=float, nargs='+', default=[60.0],
+                        help="Speed-up over real time; 0 replays as fast as possible")
+    replay.add_argument('--output', default='replay_results.json')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        events = generate_event_log(_build_city(args), args.events, args.duration, args.seed)
+        with open(args.output, 'w') as output:
+            for event in events:
+                output.write(json.dumps(event) + '\n')
+        print(f"Wrote {len(events)} events to {args.output}", file=sys.stderr)
+        return
+
+    if min(args.concurrency) < 1:
+        parser.error("--concurrency must be at least 1")
+    if min(args.rate) < 0:
+        parser.error("--rate must not be negative")
+    try:
+        events = load_events(args.log)
+    except ValueError as error:
+        parser.error(str(error))
+    results = []
+    for concurrency in args.concurrency:
+        for rate in args.rate:
+            print(f"Replaying {len(events)} events at concurrency {concurrency}, rate {rate}...",
+                  file=sys.stderr)
+            # Every replay starts from a fresh graph so updates do not accumulate
+            results.append(ReplayEngine(_build_city(args), concurrency, rate).run(events))
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'log': args.log,
+            'arguments': vars(args),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
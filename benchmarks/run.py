@@ -0,0 +1,282 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+from graph.algorithms import dijkstra, dijkstra_many, yen_k_shortest_paths
+from utils import constants
+from utils.synthetic import CITY_LAYOUTS, generate_city
+
+TIMES_OF_DAY = list(constants.TIME_WEIGHTS)
+# Queries without a use case are part of the mix too
+USE_CASES = [None, *constants.USE_CASES]
+
+def run_case(
+    layout: str,
+    size: int,
+    seed: int,
+    queries: int,
+    k: int,
+    k_queries: int,
+    matrix_size: int,
+    max_render_nodes: int,
+    phase_seconds: float = 60.0,
+    max_yen_nodes: int = 20000,
+    max_traced_build_nodes: int = 100000
+) -> Dict:
+    """Benchmark one synthetic city and return its metrics
+
+    Timings are taken without tracing. Each phase's peak memory is then
+    measured by tracing one representative run of it, so the figures are the
+    extra memory that phase allocates on top of the built city. Cities above
+    `max_traced_build_nodes` are not built a second time under tracing; the
+    build's growth in peak RSS is recorded instead.
+
+    Query phases stop starting new queries once `phase_seconds` have passed,
+    and Yen's is skipped above `max_yen_nodes`, where one query can take
+    minutes; each summary's `count` is what actually ran.
+    """
+    trace_build = size <= max_traced_build_nodes
+    rss_before = _peak_rss_kb()
+    started = time.perf_counter()
+    city_graph = generate_city(layout, size, seed)
+    build_seconds = time.perf_counter() - started
+    rss_after = _peak_rss_kb()
+
+    rng = random.Random(seed)
+    nodes = list(city_graph.graph.nodes())
+
+    def random_query():
+        return (
+            rng.choice(nodes), rng.choice(nodes),
+            rng.choice(TIMES_OF_DAY), rng.choice(USE_CASES)
+        )
+
+    shortest_queries = [random_query() for _ in range(queries)]
+    shortest = _latencies(
+        shortest_queries, lambda q: dijkstra(city_graph, *q), phase_seconds
+    )
+    if len(nodes) > max_yen_nodes:
+        k_queries_list = []
+        k_shortest = {'skipped': f"more than {max_yen_nodes} nodes"}
+    else:
+        k_queries_list = [random_query() for _ in range(k_queries)]
+        k_shortest = _latencies(
+            k_queries_list,
+            lambda q: yen_k_shortest_paths(city_graph, q[0], q[1], k, q[2], q[3]),
+            phase_seconds
+        )
+
+    origins = rng.sample(nodes, min(matrix_size, len(nodes)))
+    destinations = set(rng.sample(nodes, min(matrix_size, len(nodes))))
+    matrix_rows = 0
+    started = time.perf_counter()
+    for origin in origins:
+        dijkstra_many(city_graph, origin, destinations, 'morning')
+        matrix_rows += 1
+        if time.perf_counter() - started > phase_seconds:
+            break
+    matrix_seconds = time.perf_counter() - started
+
+    peak_bytes = {}
+    if trace_build:
+        peak_bytes['build'] = _traced_peak(lambda: generate_city(layout, size, seed))
+    if shortest_queries:
+        peak_bytes['dijkstra'] = _traced_peak(lambda: dijkstra(city_graph, *shortest_queries[0]))
+    if k_queries_list:
+        q = k_queries_list[0]
+        peak_bytes['yen'] = _traced_peak(
+            lambda: yen_k_shortest_paths(city_graph, q[0], q[1], k, q[2], q[3])
+        )
+    peak_bytes['matrix_row'] = _traced_peak(
+        lambda: dijkstra_many(city_graph, origins[0], destinations, 'morning')
+    )
+    render = _render_times(city_graph, rng.choice(nodes), rng.choice(nodes), max_render_nodes)
+    if 'peak_bytes' in render:
+        peak_bytes.update(render.pop('peak_bytes'))
+
+    result = {
+        'layout': layout,
+        'requested_size': size,
+        'nodes': city_graph.graph.number_of_nodes(),
+        'edges': city_graph.graph.number_of_edges(),
+        'build_seconds': build_seconds,
+        'build_peak_rss_growth_kb': (
+            rss_after - rss_before if rss_before is not None and not trace_build else None
+        ),
+        'peak_bytes': peak_bytes,
+        'dijkstra_ms': shortest,
+        'yen_ms': dict(k_shortest, k=k),
+        'matrix': {
+            'pairs': matrix_rows * len(destinations),
+            'requested_pairs': len(origins) * len(destinations),
+            'seconds': matrix_seconds,
+            'pairs_per_second': matrix_rows * len(destinations) / matrix_seconds,
+        },
+        'render': render,
+    }
+    return result
+
+def _traced_peak(run: Callable) -> int:
+    """Peak bytes allocated by one call of `run`, measured with tracemalloc"""
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _peak_rss_kb() -> Optional[int]:
+    """Process peak RSS as reported by getrusage, or None where it is unavailable"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+def _latencies(queries: List, search: Callable, budget_seconds: float) -> Dict:
+    """Time queries until the budget is spent and summarise the latencies in milliseconds"""
+    samples = []
+    phase_started = time.perf_counter()
+    for query in queries:
+        started = time.perf_counter()
+        if samples and started - phase_started > budget_seconds:
+            break
+        search(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    return dict(summarize(samples), requested=len(queries))
+
+def summarize(samples: List[float]) -> Dict:
+    """Count, mean, percentiles and max of a list of samples"""
+    samples = sorted(samples)
+    if not samples:
+        return {'count': 0}
+    return {
+        'count': len(samples),
+        'mean': sum(samples) / len(samples),
+        'p50': _percentile(samples, 50),
+        'p90': _percentile(samples, 90),
+        'p99': _percentile(samples, 99),
+        'max': samples[-1],
+    }
+
+def _percentile(sorted_samples: List[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    rank = max(1, round(percent / 100 * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+def _render_times(city_graph, start: str, end: str, max_render_nodes: int) -> Dict:
+    """Time the network image and folium map for a route, if the city is small enough
+
+    Each render is repeated under tracemalloc for its peak memory.
+    """
+    if city_graph.graph.number_of_nodes() > max_render_nodes:
+        return {'skipped': f"more than {max_render_nodes} nodes"}
+    try:
+        from graph.visualization import visualize_graph, visualize_on_map
+    except ImportError as error:
+        return {'skipped': f"visualization dependencies missing: {error}"}
+
+    route = dijkstra(city_graph, start, end, 'morning')
+    started = time.perf_counter()
+    visualize_graph(city_graph, route, 'morning')
+    graph_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    visualize_on_map(city_graph, route).get_root().render()
+    map_seconds = time.perf_counter() - started
+    return {
+        'visualize_graph_seconds': graph_seconds,
+        'visualize_on_map_seconds': map_seconds,
+        'peak_bytes': {
+            'visualize_graph': _traced_peak(lambda: visualize_graph(city_graph, route, 'morning')),
+            'visualize_on_map': _traced_peak(
+                lambda: visualize_on_map(city_graph, route).get_root().render()
+            ),
+        },
+    }
+
+def compare(baseline: Dict, current: Dict) -> List[str]:
+    """Describe how the headline metrics changed between two result files"""
+    metrics = [
+        ('dijkstra p50 ms', lambda r: r['dijkstra_ms'].get('p50')),
+        ('dijkstra p99 ms', lambda r: r['dijkstra_ms'].get('p99')),
+        ('yen p50 ms', lambda r: r['yen_ms'].get('p50')),
+        ('matrix pairs/s', lambda r: r['matrix']['pairs_per_second']),
+        ('build peak MB', lambda r: r['peak_bytes'].get('build', 0) / 2**20),
+        ('yen peak MB', lambda r: r['peak_bytes'].get('yen', 0) / 2**20),
+        ('map render s', lambda r: r['render'].get('visualize_on_map_seconds')),
+    ]
+    old_cases = {(r['layout'], r['requested_size']): r for r in baseline['results']}
+    lines = []
+    for result in current['results']:
+        old = old_cases.get((result['layout'], result['requested_size']))
+        if old is None:
+            continue
+        for name, read in metrics:
+            before, after = read(old), read(result)
+            if before and after:
+                lines.append(
+                    f"{result['layout']:>13} {result['requested_size']:>8} {name:<16} "
+                    f"{before:12.3f} -> {after:12.3f} ({after / before:6.2f}x)"
+                )
+    return lines
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point: python -m benchmarks.run"""
+    parser = argparse.ArgumentParser(description="Routing scaling benchmarks on synthetic cities")
+    parser.add_argument('--layouts', nargs='+', choices=CITY_LAYOUTS, default=list(CITY_LAYOUTS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--queries', type=int, default=200, help="Dijkstra queries per city")
+    parser.add_argument('--k', type=int, default=3, help="Routes per Yen's query")
+    parser.add_argument('--k-queries', type=int, default=20, help="Yen's queries per city")
+    parser.add_argument('--matrix-size', type=int, default=20,
+                        help="Origins and destinations in the travel time matrix")
+    parser.add_argument('--max-render-nodes', type=int, default=2000,
+                        help="Skip rendering for larger cities")
+    parser.add_argument('--phase-seconds', type=float, default=60.0,
+                        help="Stop starting new queries in a phase after this many seconds")
+    parser.add_argument('--max-yen-nodes', type=int, default=20000,
+                        help="Skip Yen's queries for larger cities")
+    parser.add_argument('--max-traced-build-nodes', type=int, default=100000,
+                        help="Measure larger builds by peak RSS instead of a second traced build")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    for layout in args.layouts:
+        for size in args.sizes:
+            print(f"Benchmarking {layout} city with {size} intersections...", file=sys.stderr)
+            results.append(run_case(
+                layout, size, args.seed, args.queries, args.k,
+                args.k_queries, args.matrix_size, args.max_render_nodes,
+                args.phase_seconds, args.max_yen_nodes, args.max_traced_build_nodes
+            ))
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            # Whole-run high-water mark; per-case figures are in each result's peak_bytes
+            'process_peak_rss_kb': _peak_rss_kb(),
+            'arguments': vars(args),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            for line in compare(json.load(baseline), report):
+                print(line)
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,115 @@
 import heapq
 from typing import List, Tuple, Optional, Dict, Set
 from .core import CityGraph
+from .instrumentation import INSTRUMENTATION
+from .models import RouteResult
 
+# Per-search work counters returned by _search, in order
+SEARCH_COUNTERS = ('heap_pushes', 'heap_pops', 'nodes_settled', 'edges_scanned')
+
+@INSTRUMENTATION.timed('routing.dijkstra')
 def dijkstra(
     city_graph: CityGraph,
     start: str,
     end: str,
     time_of_day: Optional[str] = None,
+    use_case: Optional[str] = None,
+    excluded_edges: Optional[Set[Tuple[str, str]]] = None
+) -> RouteResult:
+    """Find shortest path using Dijkstra's algorithm with time and use case considerations
+
+    Edges in `excluded_edges` are skipped, which lets Yen's algorithm search
+    without mutating a graph that may be shared between sessions.
+    """
+    route, counts = _shortest_route(
+        city_graph, start, end, time_of_day, use_case, excluded_edges
+    )
+    if INSTRUMENTATION.enabled:
+        INSTRUMENTATION.record_query('dijkstra', **dict(zip(SEARCH_COUNTERS, counts)))
+    return route
+
+def _shortest_route(
+    city_graph: CityGraph,
+    start: str,
+    end: str,
+    time_of_day: Optional[str],
+    use_case: Optional[str],
+    excluded_edges: Optional[Set[Tuple[str, str]]] = None
+) -> Tuple[RouteResult, List[int]]:
+    """Single destination search returning the route and its work counters"""
+    settled, previous, counts = _search(
+        city_graph, start, {end}, time_of_day, use_case, excluded_edges
+    )
+    if end not in settled:
+        return RouteResult.empty(), counts
+    return _build_route(previous, start, end, settled[end]), counts
+
+@INSTRUMENTATION.timed('routing.dijkstra_many')
+def dijkstra_many(
+    city_graph: CityGraph,
+    start: str,
+    ends: Set[str],
+    time_of_day: Optional[str] = None,
     use_case: Optional[str] = None
-) -> Tuple[float, List[str]]:
-    """Find shortest path using Dijkstra's algorithm with time and use case considerations"""
+) -> Dict[str, RouteResult]:
+    """Find shortest paths from one start to several destinations with a single search"""
+    settled, previous, counts = _search(city_graph, start, set(ends), time_of_day, use_case)
+    if INSTRUMENTATION.enabled:
+        INSTRUMENTATION.record_query(
+            'dijkstra_many', targets=len(ends), **dict(zip(SEARCH_COUNTERS, counts))
+        )
+    return {
+        end: _build_route(previous, start, end, settled[end]) if end in settled
+        else RouteResult.empty()
+        for end in ends
+    }
+
+def _search(
+    city_graph: CityGraph,
+    start: str,
+    targets: Set[str],
+    time_of_day: Optional[str],
+    use_case: Optional[str],
+    excluded_edges: Optional[Set[Tuple[str, str]]] = None
+) -> Tuple[Dict[str, float], Dict[str, Tuple[str, float]], List[int]]:
+    """Run Dijkstra from start until every reachable target is settled
+
+    Also returns the work done as counts in SEARCH_COUNTERS order. They are
+    plain local integers, bumped once per heap operation or settled node, so
+    they cost next to nothing when instrumentation is off.
+    """
     heap = []
-    heapq.heappush(heap, (0, start, []))
+    heapq.heappush(heap, (0, start))
     
     visited = {node: float('inf') for node in city_graph.graph.nodes()}
     visited[start] = 0
-    paths = {start: []}
+    # node -> (previous node, adjusted weight of the edge used to reach it)
+    previous: Dict[str, Tuple[str, float]] = {}
+    settled: Dict[str, float] = {}
+    remaining = set(targets)
+    pushes, pops, nodes_settled, edges_scanned = 1, 0, 0, 0
     
     while heap:
-        current_dist, current_node, path = heapq.heappop(heap)
-        
-        if current_node == end:
-            return current_dist, path + [current_node]
+        current_dist, current_node = heapq.heappop(heap)
+        pops += 1
         
         if current_dist > visited[current_node]:
             continue
+        
+        nodes_settled += 1
+        if current_node in remaining:
+            settled[current_node] = current_dist
+            remaining.discard(current_node)
+            if not remaining:
+                break
+            
+        neighbors = city_graph.graph[current_node]
+        edges_scanned += len(neighbors)
+        for neighbor, edge_data in neighbors.items():
+            if excluded_edges and (current_node, neighbor) in excluded_edges:
+                edges_scanned -= 1
+                continue
             
-        for neighbor, edge_data in city_graph.graph[current_node].items():
             weight = _calculate_adjusted_weight(
                 city_graph, current_node, neighbor, edge_data['weight'], 
                 time_of_day, use_case
@@ -36,13 +119,31 @@ def dijkstra(
             
             if distance < visited[neighbor]:
                 visited[neighbor] = distance
-                paths[neighbor] = path + [current_node]
-                heapq.heappush(heap, (distance, neighbor, path + [current_node]))
+                previous[neighbor] = (current_node, weight)
+                heapq.heappush(heap, (distance, neighbor))
+                pushes += 1
     
-    return float('inf'), []
-
+    return settled, previous, [pushes, pops, nodes_settled, edges_scanned]
 
+def _build_route(
+    previous: Dict[str, Tuple[str, float]],
+    start: str,
+    end: str,
+    cost: float
+) -> RouteResult:
+    """Walk the predecessor map back from end to start"""
+    path = [end]
+    segment_costs = []
+    node = end
+    while node != start:
+        node, weight = previous[node]
+        path.append(node)
+        segment_costs.append(weight)
+    path.reverse()
+    segment_costs.reverse()
+    return RouteResult(cost, path, segment_costs)
 
+@INSTRUMENTATION.timed('routing.yen_k_shortest_paths')
 def yen_k_shortest_paths(
     city_graph: CityGraph,
     start: str,
@@ -50,55 +151,58 @@ def yen_k_shortest_paths(
     k: int = 3,
     time_of_day: Optional[str] = None,
     use_case: Optional[str] = None
-) -> List[Tuple[float, List[str]]]:
+) -> List[RouteResult]:
     """Find k shortest paths using Yen's algorithm"""
     paths = []
     
     # Get shortest path
-    dist, path = dijkstra(city_graph, start, end, time_of_day, use_case)
-    if path:
-        paths.append((dist, path))
+    route, counts = _shortest_route(city_graph, start, end, time_of_day, use_case)
+    spur_searches = 0
+    if not route.path:
+        _record_yen(counts, spur_searches)
+        return paths
+    paths.append(route)
     
     # Find k-1 more paths
     for i in range(1, k):
-        for j in range(len(paths[i-1][1]) - 1):
-            spur_node = paths[i-1][1][j]
-            root_path = paths[i-1][1][:j+1]
-            
-            edges_removed = []
-            for prev_path in paths:
-                if len(prev_path[1]) > j and root_path == prev_path[1][:j+1]:
-                    u = prev_path[1][j]
-                    v = prev_path[1][j+1]
-                    if city_graph.graph.has_edge(u, v):
-                        edges_removed.append((u, v, city_graph.graph[u][v]['weight']))
-                        city_graph.graph.remove_edge(u, v)
+        for j in range(len(paths[i-1].path) - 1):
+            spur_node = paths[i-1].path[j]
+            root_path = paths[i-1].path[:j+1]
+            root_costs = paths[i-1].segment_costs[:j]
             
-            spur_dist, spur_path = dijkstra(city_graph, spur_node, end, time_of_day, use_case)
+            edges_removed = set()
+            for prev_route in paths:
+                if len(prev_route.path) > j and root_path == prev_route.path[:j+1]:
+                    u = prev_route.path[j]
+                    v = prev_route.path[j+1]
+                    edges_removed.add((u, v))
+                    edges_removed.add((v, u))
             
-            for u, v, w in edges_removed:
-                city_graph.graph.add_edge(u, v, weight=w)
+            spur_route, spur_counts = _shortest_route(
+                city_graph, spur_node, end, time_of_day, use_case, edges_removed
+            )
+            spur_searches += 1
+            counts = [total + spur for total, spur in zip(counts, spur_counts)]
             
-            if spur_path:
-                total_path = root_path[:-1] + spur_path
-                total_dist = 0
-                
-                for x in range(len(total_path)-1):
-                    u = total_path[x]
-                    v = total_path[x+1]
-                    weight = _calculate_adjusted_weight(
-                        city_graph, u, v, city_graph.graph[u][v]['weight'],
-                        time_of_day, use_case
-                    )
-                    total_dist += weight
+            if spur_route.path:
+                total_path = root_path[:-1] + spur_route.path
+                segment_costs = root_costs + spur_route.segment_costs
                 
-                if not any(p[1] == total_path for p in paths):
-                    paths.append((total_dist, total_path))
+                if not any(p.path == total_path for p in paths):
+                    paths.append(RouteResult(sum(segment_costs), total_path, segment_costs))
         
         if len(paths) <= i:
             break
     
-    return sorted(paths, key=lambda x: x[0])[:k]
+    _record_yen(counts, spur_searches)
+    return sorted(paths, key=lambda x: x.cost)[:k]
+
+def _record_yen(counts: List[int], spur_searches: int):
+    """Report the combined work of a Yen's query"""
+    if INSTRUMENTATION.enabled:
+        INSTRUMENTATION.record_query(
+            'yen', spur_searches=spur_searches, **dict(zip(SEARCH_COUNTERS, counts))
+        )
 
 def _calculate_adjusted_weight(
     city_graph: CityGraph,
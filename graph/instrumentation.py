@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Deque, Dict, Iterator, List
+
+class Instrumentation:
+    """Opt-in registry of routing counters and wall-clock timers
+
+    Everything is a no-op while `enabled` is False: timers skip straight to
+    the wrapped call, and the search loops only keep a few local integers that
+    are reported once per query when instrumentation is on.
+    """
+
+    def __init__(self, enabled: bool = False, history: int = 1000):
+        self.enabled = enabled
+        self.history = history
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Drop every collected counter, timing and query record"""
+        with self._lock:
+            self.counters: Dict[str, int] = defaultdict(int)
+            self.timings: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.history))
+            # name -> [count, total seconds, max seconds] over all samples
+            self.timer_totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+            self.queries: Deque[Dict] = deque(maxlen=self.history)
+
+    def record_query(self, kind: str, **counts: int):
+        """Record the work done by one routing query and add it to the totals"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[f"{kind}.queries"] += 1
+            for name, value in counts.items():
+                self.counters[f"{kind}.{name}"] += value
+            self.queries.append({'kind': kind, **counts})
+
+    def record_time(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.timings[name].append(seconds)
+            totals = self.timer_totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the enclosed block under `name`"""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(name, time.perf_counter() - started)
+
+    def timed(self, name: str) -> Callable:
+        """Decorator form of `timer`"""
+        def decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record_time(name, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict:
+        """Summary of everything collected so far
+
+        Timer count, total, mean and max cover every sample since the last
+        reset; percentiles are under `recent` and cover only the last
+        `history` samples, which `recent.samples` reports.
+        """
+        with self._lock:
+            timers = {}
+            for name, samples in self.timings.items():
+                ordered = sorted(samples)
+                count, total, longest = self.timer_totals[name]
+                timers[name] = {
+                    'count': count,
+                    'total_seconds': total,
+                    'mean_seconds': total / count,
+                    'max_seconds': longest,
+                    'recent': {
+                        'samples': len(ordered),
+                        'p50_seconds': ordered[len(ordered) // 2],
+                        'p95_seconds': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                        'max_seconds': ordered[-1],
+                    },
+                }
+            return {
+                'enabled': self.enabled,
+                'counters': dict(self.counters),
+                'timers': timers,
+                'recent_queries': list(self.queries)[-20:],
+            }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.snapshot(), **kwargs)
+
+# Process-wide registry; set TRAFFIC_INSTRUMENTATION=1 to enable at startup
+INSTRUMENTATION = Instrumentation(enabled=os.environ.get('TRAFFIC_INSTRUMENTATION') == '1')
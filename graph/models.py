@@ -0,0 +1,34 @@
+from typing import Dict, Iterator, List, Tuple
+
+class RouteResult:
+    """Result of a route search with the per-segment costs computed during the search"""
+    __slots__ = ('cost', 'path', 'segment_costs')
+
+    def __init__(self, cost: float, path: List[str], segment_costs: List[float]):
+        self.cost = cost
+        self.path = path
+        self.segment_costs = segment_costs
+
+    @classmethod
+    def empty(cls) -> 'RouteResult':
+        """Result returned when no path exists"""
+        return cls(float('inf'), [], [])
+
+    def segments(self) -> Iterator[Tuple[str, str, float]]:
+        """Iterate over (from, to, cost) for every road on the route"""
+        return zip(self.path[:-1], self.path[1:], self.segment_costs)
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-friendly representation"""
+        return {
+            'cost': self.cost if self.path else None,
+            'path': list(self.path),
+            'segment_costs': list(self.segment_costs),
+        }
+
+    def __bool__(self) -> bool:
+        return bool(self.path)
+
+    def __repr__(self) -> str:
+        return f"RouteResult(cost={self.cost!r}, path={self.path!r})"
+
@@ -1,19 +1,32 @@
-from typing import List, Optional
+from io import BytesIO
+from typing import Optional
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
+from matplotlib.figure import Figure
 import networkx as nx
-from PIL import Image
 import folium
 from .core import CityGraph
+from .instrumentation import INSTRUMENTATION
+from .models import RouteResult
 
+@INSTRUMENTATION.timed('render.visualize_graph')
 def visualize_graph(
     city_graph: CityGraph,
-    highlight_path: Optional[List[str]] = None,
+    highlight_route: Optional[RouteResult] = None,
     time_of_day: Optional[str] = None,
     congestion_info: bool = False
-) -> Image.Image:
-    """Visualize the graph with optional path highlighting"""
-    plt.figure(figsize=(14, 10))
+) -> bytes:
+    """Visualize the graph with optional route highlighting and return PNG bytes
+
+    Every edge is coloured by its time-of-day weight plus user reports. The
+    highlighted route is labelled with the segment costs the search gave it,
+    which include any use-case multipliers.
+
+    Rendering uses a standalone Figure and an in-memory buffer rather than
+    pyplot state and a file on disk, so concurrent sessions can render safely.
+    The encoded PNG is returned as is; it is a fraction of the size of the
+    decoded image, which matters when it is cached.
+    """
     pos = {node: (city_graph.node_coords[node][1], city_graph.node_coords[node][0]) 
            for node in city_graph.graph.nodes()}
     
@@ -26,9 +39,10 @@ def visualize_graph(
     
     max_weight = max(weights) if weights else 1
     norm = mcolors.Normalize(vmin=0, vmax=max_weight)
-    cmap = plt.cm.get_cmap('RdYlGn_r')
+    cmap = plt.get_cmap('RdYlGn_r')
     
-    fig, ax = plt.subplots(figsize=(14, 10))
+    fig = Figure(figsize=(14, 10))
+    ax = fig.subplots()
     
     # Draw nodes
     node_colors = []
@@ -73,9 +87,9 @@ def visualize_graph(
         ax=ax
     )
     
-    # Highlight path
-    if highlight_path:
-        path_edges = list(zip(highlight_path[:-1], highlight_path[1:]))
+    # Highlight path, labelled with the costs computed by the route search
+    if highlight_route:
+        path_edges = [(u, v) for u, v, _ in highlight_route.segments()]
         nx.draw_networkx_edges(
             city_graph.graph, pos,
             edgelist=path_edges,
@@ -84,6 +98,13 @@ def visualize_graph(
             alpha=0.9,
             ax=ax
         )
+        nx.draw_networkx_edge_labels(
+            city_graph.graph, pos,
+            edge_labels={(u, v): f"{cost:.1f} min" for u, v, cost in highlight_route.segments()},
+            font_color='blue',
+            font_size=9,
+            ax=ax
+        )
     
     # Add congestion info
     if congestion_info:
@@ -91,16 +112,18 @@ def visualize_graph(
     
     # Add colorbar
     if edge_collection:
-        plt.colorbar(edge_collection, ax=ax, label='Travel Time (minutes)')
-    
-    plt.title("City Road Network (Green = Fast, Red = Congested)", fontsize=14)
-    plt.axis('off')
-    plt.tight_layout()
-    plt.savefig('graph.png', bbox_inches='tight', dpi=300)
-    plt.close()
-    return Image.open('graph.png')
+        fig.colorbar(edge_collection, ax=ax, label='Travel Time (minutes)')
+    
+    ax.set_title("City Road Network (Green = Fast, Red = Congested)", fontsize=14)
+    ax.axis('off')
+    fig.tight_layout()
+    buffer = BytesIO()
+    with INSTRUMENTATION.timer('render.encode_png'):
+        fig.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+    return buffer.getvalue()
 
-def visualize_on_map(city_graph: CityGraph, path: Optional[List[str]] = None) -> folium.Map:
+@INSTRUMENTATION.timed('map.visualize_on_map')
+def visualize_on_map(city_graph: CityGraph, route: Optional[RouteResult] = None) -> folium.Map:
     """Visualize the graph on a real map"""
     city_center = city_graph.calculate_center()
     m = folium.Map(location=city_center, zoom_start=14)
@@ -129,15 +152,15 @@ def visualize_on_map(city_graph: CityGraph, path: Optional[List[str]] = None) ->
         ).add_to(m)
     
     # Highlight path
-    if path:
-        path_coords = [city_graph.node_coords[node] for node in path]
-        folium.PolyLine(
-            path_coords,
-            color='blue',
-            weight=8,
-            opacity=0.9,
-            tooltip="Selected Route"
-        ).add_to(m)
+    if route:
+        for u, v, cost in route.segments():
+            folium.PolyLine(
+                [city_graph.node_coords[u], city_graph.node_coords[v]],
+                color='blue',
+                weight=8,
+                opacity=0.9,
+                tooltip=f"Selected Route: {u} to {v}: {cost:.1f} min"
+            ).add_to(m)
     
     return m
 
@@ -0,0 +1,170 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+from graph.algorithms import dijkstra_many, yen_k_shortest_paths
+from graph.core import CityGraph
+from graph.models import RouteResult
+
+# (start, time_of_day, use_case, k)
+QueryKey = Tuple[str, Optional[str], Optional[str], int]
+
+class RouteBatcher:
+    """Collect route queries for a short window and answer them with shared searches
+
+    Single-route queries that share an origin, time of day and use case are
+    answered by one multi-destination Dijkstra run; identical k-shortest
+    queries share one Yen's run. Searches run on `executor` so the event loop
+    never blocks, and graph updates wait until no search is reading the graph.
+    """
+
+    def __init__(
+        self,
+        city_graph: CityGraph,
+        window: float = 0.005,
+        executor: Optional[Executor] = None
+    ):
+        self.city_graph = city_graph
+        self.window = window
+        self.executor = executor or ThreadPoolExecutor()
+        self.stats = {'queries': 0, 'searches': 0, 'batches': 0}
+        self._pending: List[Tuple[QueryKey, str, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._active_batches = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def route(
+        self,
+        start: str,
+        end: str,
+        k: int = 1,
+        time_of_day: Optional[str] = None,
+        use_case: Optional[str] = None
+    ) -> Tuple[int, List[RouteResult]]:
+        """Queue a route query and return (graph version, routes) once its batch runs
+
+        Arguments are checked here so a query that cannot be grouped fails on
+        its own instead of failing the rest of its batch.
+        """
+        if not isinstance(start, str) or not isinstance(end, str):
+            raise TypeError("start and end must be intersection names")
+        if not isinstance(k, int) or isinstance(k, bool):
+            raise TypeError(f"k must be an integer, got {k!r}")
+        for name, value in (('time_of_day', time_of_day), ('use_case', use_case)):
+            if value is not None and not isinstance(value, str):
+                raise TypeError(f"{name} must be a string or None, got {value!r}")
+        key = (start, time_of_day, use_case, k)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((key, end, future))
+        self.stats['queries'] += 1
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_after_window())
+        return await future
+
+    async def update(self, apply: Callable, *args):
+        """Apply a graph mutation once in-flight searches have finished"""
+        async with self._write_lock:
+            await self._idle.wait()
+            return apply(*args)
+
+    async def _flush_after_window(self):
+        """Wait for the batching window to close, then run everything queued"""
+        await asyncio.sleep(self.window)
+        batch, self._pending = self._pending, []
+        self._flush_task = None
+        try:
+            await self._run_batch(batch)
+        except Exception as error:
+            # Never leave a caller waiting on a batch that failed outright
+            for _, _, future in batch:
+                _resolve([future], exception=error)
+
+    async def _run_batch(self, batch: List[Tuple[QueryKey, str, asyncio.Future]]):
+        """Group the batch into shared searches and resolve every query's future"""
+        groups: Dict[QueryKey, Dict[str, List[asyncio.Future]]] = {}
+        for key, end, future in batch:
+            groups.setdefault(key, {}).setdefault(end, []).append(future)
+
+        async with self._write_lock:
+            self._active_batches += 1
+            self._idle.clear()
+
+        try:
+            version = self.city_graph.version
+            self.stats['batches'] += 1
+            await asyncio.gather(*(
+                self._run_group(key, waiters, version)
+                for key, waiters in groups.items()
+            ))
+        finally:
+            self._active_batches -= 1
+            if not self._active_batches:
+                self._idle.set()
+
+    async def _run_group(
+        self,
+        key: QueryKey,
+        waiters: Dict[str, List[asyncio.Future]],
+        version: int
+    ):
+        """Run the searches for one origin in parallel and hand out the results"""
+        start, time_of_day, use_case, k = key
+
+        if k == 1:
+            jobs = [(list(waiters), partial(
+                dijkstra_many, self.city_graph, start, set(waiters), time_of_day, use_case
+            ))]
+        else:
+            jobs = [([end], partial(
+                _yen_by_end, self.city_graph, start, end, k, time_of_day, use_case
+            )) for end in waiters]
+
+        await asyncio.gather(*(
+            self._run_job(job, ends, waiters, version) for ends, job in jobs
+        ))
+
+    async def _run_job(
+        self,
+        job: Callable,
+        ends: List[str],
+        waiters: Dict[str, List[asyncio.Future]],
+        version: int
+    ):
+        """Run one search on the executor and resolve the queries it answers"""
+        self.stats['searches'] += 1
+        try:
+            routes_by_end = await asyncio.get_running_loop().run_in_executor(self.executor, job)
+        except Exception as error:
+            for end in ends:
+                _resolve(waiters[end], exception=error)
+            return
+
+        for end in ends:
+            routes = routes_by_end[end]
+            if isinstance(routes, RouteResult):
+                routes = [routes] if routes.path else []
+            _resolve(waiters[end], result=(version, routes))
+
+def _yen_by_end(
+    city_graph: CityGraph,
+    start: str,
+    end: str,
+    k: int,
+    time_of_day: Optional[str],
+    use_case: Optional[str]
+) -> Dict[str, List[RouteResult]]:
+    """Run Yen's algorithm and key the result like dijkstra_many"""
+    return {end: yen_k_shortest_paths(city_graph, start, end, k, time_of_day, use_case)}
+
+def _resolve(futures: List[asyncio.Future], result=None, exception: Optional[Exception] = None):
+    """Complete every still-waiting future with the shared result"""
+    for future in futures:
+        if future.done():
+            continue
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
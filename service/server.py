@@ -0,0 +1,208 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+from concurrent.futures import Executor, ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from graph.core import CityGraph
+from graph.instrumentation import INSTRUMENTATION
+from utils.constants import TIME_WEIGHTS, USE_CASES
+from utils.helpers import initialize_sample_city
+from .batching import RouteBatcher
+
+logger = logging.getLogger(__name__)
+
+# Yen's cost grows faster than linearly in k; the app never asks for more than 5
+MAX_ROUTES = 10
+
+class RequestError(Exception):
+    """Raised for malformed or unanswerable requests; reported as HTTP 400"""
+
+class RoutingService:
+    """Headless JSON-over-HTTP routing service around a shared CityGraph
+
+    Endpoints:
+        GET  /health      -> graph version and batching statistics
+        GET  /metrics     -> routing instrumentation snapshot
+        POST /route       {"start", "end", "k"?, "time_of_day"?, "use_case"?}
+        POST /report      {"from", "to", "delay"}
+        POST /congestion  {"from", "to", "active"?}
+    """
+
+    def __init__(
+        self,
+        city_graph: Optional[CityGraph] = None,
+        window: float = 0.005,
+        executor: Optional[Executor] = None
+    ):
+        self.city_graph = city_graph or initialize_sample_city()
+        self.batcher = RouteBatcher(self.city_graph, window, executor)
+
+    async def handle(self, method: str, path: str, payload: Dict) -> Tuple[int, Dict]:
+        """Dispatch a decoded request and return (status, JSON body)"""
+        routes = {
+            ('GET', '/health'): self._health,
+            ('GET', '/metrics'): self._metrics,
+            ('POST', '/route'): self._route,
+            ('POST', '/report'): self._report,
+            ('POST', '/congestion'): self._congestion,
+        }
+        handler = routes.get((method, path))
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {'error': f"No endpoint {method} {path}"}
+        try:
+            return HTTPStatus.OK, await handler(payload)
+        except RequestError as error:
+            return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+        except Exception:
+            logger.exception("Request %s %s failed", method, path)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "Internal server error"}
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.AbstractServer:
+        """Start listening; pass port=0 to bind a free port (see server.sockets)"""
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def _health(self, payload: Dict) -> Dict:
+        return {'status': 'ok', 'graph_version': self.city_graph.version, **self.batcher.stats}
+
+    async def _metrics(self, payload: Dict) -> Dict:
+        return INSTRUMENTATION.snapshot()
+
+    async def _route(self, payload: Dict) -> Dict:
+        start = self._node(payload, 'start')
+        end = self._node(payload, 'end')
+        k = payload.get('k', 1)
+        if not isinstance(k, int) or isinstance(k, bool):
+            raise RequestError(f"'k' must be an integer, got {k!r}")
+        if not 1 <= k <= MAX_ROUTES:
+            raise RequestError(f"'k' must be between 1 and {MAX_ROUTES}")
+
+        time_of_day = self._choice(payload, 'time_of_day', list(TIME_WEIGHTS))
+        use_case = self._choice(payload, 'use_case', USE_CASES)
+
+        version, routes = await self.batcher.route(start, end, k, time_of_day, use_case)
+        return {
+            'graph_version': version,
+            'routes': [route.to_dict() for route in routes],
+        }
+
+    async def _report(self, payload: Dict) -> Dict:
+        u, v = self._node(payload, 'from'), self._node(payload, 'to')
+        delay = payload.get('delay')
+        if not isinstance(delay, (int, float)) or isinstance(delay, bool):
+            raise RequestError(f"'delay' must be a number of minutes, got {delay!r}")
+        if not math.isfinite(delay) or delay < 0:
+            raise RequestError("'delay' must be a finite, non-negative number of minutes")
+        if not await self.batcher.update(self.city_graph.add_user_report, u, v, delay):
+            raise RequestError(f"No road between {u} and {v}")
+        return {'graph_version': self.city_graph.version}
+
+    async def _congestion(self, payload: Dict) -> Dict:
+        u, v = self._node(payload, 'from'), self._node(payload, 'to')
+        active = payload.get('active', True)
+        if not isinstance(active, bool):
+            raise RequestError(f"'active' must be true or false, got {active!r}")
+        if active:
+            update = self.city_graph.add_congestion_zone
+        else:
+            update = self.city_graph.remove_congestion_zone
+        changed = await self.batcher.update(update, u, v)
+        return {'changed': changed, 'graph_version': self.city_graph.version}
+
+    def _node(self, payload: Dict, field: str) -> str:
+        """Read an intersection name from the payload and check it exists"""
+        node = payload.get(field)
+        if node not in self.city_graph.graph:
+            raise RequestError(f"Unknown intersection for '{field}': {node!r}")
+        return node
+
+    def _choice(self, payload: Dict, field: str, allowed: List[str]) -> Optional[str]:
+        """Read an optional field that must be one of `allowed`"""
+        value = payload.get(field)
+        if value is not None and (not isinstance(value, str) or value not in allowed):
+            raise RequestError(f"'{field}' must be one of {allowed} or null, got {value!r}")
+        return value
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one HTTP/1.1 request per connection"""
+        try:
+            try:
+                method, path, payload = await self._read_request(reader)
+            except RequestError as error:
+                status, body = HTTPStatus.BAD_REQUEST, {'error': str(error)}
+            else:
+                status, body = await self.handle(method, path, payload)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+            return
+        except Exception:
+            logger.exception("Failed to serve request")
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "Internal server error"}
+
+        try:
+            data = json.dumps(body).encode()
+            writer.write(
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict]:
+        """Parse the request line, headers and JSON body of one request"""
+        request_line = (await reader.readline()).decode('latin-1').split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if len(request_line) < 2:
+            raise RequestError("Malformed request line")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise RequestError("Content-Length must be an integer")
+        if length < 0:
+            raise RequestError("Content-Length must not be negative")
+
+        raw = await reader.readexactly(length) if length else b''
+        try:
+            payload = json.loads(raw) if raw else {}
+        except ValueError:
+            raise RequestError("Body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise RequestError("Body must be a JSON object")
+        return request_line[0].upper(), request_line[1], payload
+
+async def serve(host: str, port: int, window: float, workers: Optional[int]):
+    """Run the service until cancelled"""
+    service = RoutingService(window=window, executor=ThreadPoolExecutor(max_workers=workers))
+    server = await service.start(host, port)
+    print(f"Routing service listening on {host}:{server.sockets[0].getsockname()[1]}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    """Command line entry point: python -m service.server"""
+    parser = argparse.ArgumentParser(description="Headless traffic routing service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--window', type=float, default=0.005,
+                        help="Micro-batching window in seconds")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Search worker threads (default: executor default)")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.window, args.workers))
+
+if __name__ == "__main__":
+    main()
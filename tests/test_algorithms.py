@@ -0,0 +1,58 @@
+import math
+import networkx as nx
+from graph.algorithms import _calculate_adjusted_weight, dijkstra, yen_k_shortest_paths
+from utils.constants import TIME_WEIGHTS, USE_CASES
+from utils.helpers import initialize_sample_city
+
+def _city_with_traffic():
+    """Sample city with congestion, a report and an alert so every multiplier applies"""
+    city_graph = initialize_sample_city()
+    city_graph.add_congestion_zone('Downtown', 'Central Park')
+    city_graph.add_congestion_zone('Residential A', 'Residential B')
+    city_graph.add_user_report('Shopping Mall', 'Airport', 10)
+    return city_graph
+
+def _adjusted_graph(city_graph, time_of_day, use_case):
+    """Directed copy of the city weighted with the costs routing should apply"""
+    adjusted = nx.DiGraph()
+    for u, v, data in city_graph.graph.edges(data=True):
+        for a, b in ((u, v), (v, u)):
+            adjusted.add_edge(a, b, weight=_calculate_adjusted_weight(
+                city_graph, a, b, data['weight'], time_of_day, use_case
+            ))
+    return adjusted
+
+def test_segment_costs_sum_to_cost_with_use_case_multipliers():
+    city_graph = _city_with_traffic()
+    nodes = list(city_graph.graph.nodes())
+    for time_of_day in [None, *TIME_WEIGHTS]:
+        for use_case in [None, *USE_CASES]:
+            adjusted = _adjusted_graph(city_graph, time_of_day, use_case)
+            for start in nodes:
+                for end in nodes:
+                    route = dijkstra(city_graph, start, end, time_of_day, use_case)
+                    expected = nx.dijkstra_path_length(adjusted, start, end)
+                    assert math.isclose(route.cost, expected)
+                    assert math.isclose(sum(route.segment_costs), route.cost)
+                    for u, v, cost in route.segments():
+                        assert math.isclose(cost, adjusted[u][v]['weight'])
+
+def test_yen_segment_costs_match_route_costs():
+    city_graph = _city_with_traffic()
+    adjusted = _adjusted_graph(city_graph, 'evening', 'Delivery Truck')
+    routes = yen_k_shortest_paths(city_graph, 'Downtown', 'Airport', 4, 'evening', 'Delivery Truck')
+    assert len(routes) == 4
+    assert [route.cost for route in routes] == sorted(route.cost for route in routes)
+    for route in routes:
+        assert math.isclose(sum(route.segment_costs), route.cost)
+        for u, v, cost in route.segments():
+            assert math.isclose(cost, adjusted[u][v]['weight'])
+
+def test_use_case_multipliers_change_segment_costs():
+    city_graph = _city_with_traffic()
+    plain = dijkstra(city_graph, 'Downtown', 'Stadium', 'morning')
+    ambulance = dijkstra(city_graph, 'Downtown', 'Stadium', 'morning', 'Ambulance')
+    assert plain.path == ambulance.path == ['Downtown', 'Central Park', 'Stadium']
+    # Downtown - Central Park is congested, which halves its cost for ambulances
+    assert math.isclose(ambulance.segment_costs[0], plain.segment_costs[0] * 0.5)
+    assert math.isclose(ambulance.cost, sum(ambulance.segment_costs))
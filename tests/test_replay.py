@@ -0,0 +1,134 @@
+import json
+import time
+import pytest
+from benchmarks import replay
+from benchmarks.replay import (
+    HISTOGRAM_BUCKETS_MS, ReplayEngine, generate_event_log, latency_histogram,
+    load_events, validate_event
+)
+from utils.helpers import initialize_sample_city
+
+def _write_log(tmp_path, lines):
+    path = tmp_path / 'events.jsonl'
+    path.write_text("\n".join(
+        line if isinstance(line, str) else json.dumps(line) for line in lines
+    ) + "\n")
+    return str(path)
+
+def test_load_events_sorts_and_normalises_times(tmp_path):
+    path = _write_log(tmp_path, [
+        {'t': 2, 'type': 'report', 'from': 'Downtown', 'to': 'University', 'delay': 4},
+        '',
+        {'t': 0.5, 'type': 'route', 'start': 'Downtown', 'end': 'Airport', 'k': 3,
+         'time_of_day': 'morning', 'use_case': None},
+        {'t': 1, 'type': 'congestion', 'from': 'Downtown', 'to': 'University', 'active': False},
+    ])
+    events = load_events(path)
+    assert [event['t'] for event in events] == [0.5, 1.0, 2.0]
+    assert [event['type'] for event in events] == ['route', 'congestion', 'report']
+
+def test_load_events_converts_iso_timestamps(tmp_path):
+    path = _write_log(tmp_path, [
+        {'t': '2024-05-01T08:00:30+00:00', 'type': 'route', 'start': 'Downtown', 'end': 'Airport'},
+        {'t': '2024-05-01T08:00:00+00:00', 'type': 'route', 'start': 'Downtown', 'end': 'Stadium'},
+    ])
+    first, second = load_events(path)
+    assert second['t'] - first['t'] == 30
+    assert first['end'] == 'Stadium'
+
+def test_load_events_rejects_mixed_time_forms(tmp_path):
+    path = _write_log(tmp_path, [
+        {'t': 0, 'type': 'route', 'start': 'Downtown', 'end': 'Airport'},
+        {'t': '2024-05-01T08:00:00', 'type': 'route', 'start': 'Downtown', 'end': 'Airport'},
+    ])
+    with pytest.raises(ValueError, match=r"events\.jsonl:2: .*mixes ISO timestamps"):
+        load_events(path)
+
+def test_load_events_reports_the_bad_line(tmp_path):
+    path = _write_log(tmp_path, [
+        {'t': 0, 'type': 'route', 'start': 'Downtown', 'end': 'Airport'},
+        '{not json',
+    ])
+    with pytest.raises(ValueError, match=r"events\.jsonl:2: "):
+        load_events(path)
+
+@pytest.mark.parametrize('event', [
+    [],
+    {'t': 0, 'type': 'teleport'},
+    {'t': True, 'type': 'route', 'start': 'A', 'end': 'B'},
+    {'t': 'yesterday', 'type': 'route', 'start': 'A', 'end': 'B'},
+    {'t': 0, 'type': 'route', 'start': 'A'},
+    {'t': 0, 'type': 'route', 'start': 'A', 'end': 'B', 'k': 0},
+    {'t': 0, 'type': 'route', 'start': 'A', 'end': 'B', 'k': True},
+    {'t': 0, 'type': 'route', 'start': 'A', 'end': 'B', 'time_of_day': 'noon'},
+    {'t': 0, 'type': 'route', 'start': 'A', 'end': 'B', 'use_case': 'Tank'},
+    {'t': 0, 'type': 'report', 'from': 'A', 'to': 'B', 'delay': '5'},
+    {'t': 0, 'type': 'report', 'from': 'A', 'to': 'B', 'delay': -1},
+    {'t': 0, 'type': 'report', 'from': 'A', 'to': 'B', 'delay': float('nan')},
+    {'t': 0, 'type': 'report', 'from': 'A', 'to': 'B', 'delay': float('inf')},
+    {'t': 0, 'type': 'congestion', 'from': 'A', 'to': 'B', 'active': 'false'},
+    {'t': 0, 'type': 'congestion', 'from': 'A'},
+])
+def test_validate_event_rejects(event):
+    with pytest.raises(ValueError):
+        validate_event(event)
+
+def test_latency_histogram_buckets_include_their_upper_bound():
+    histogram = latency_histogram([0.1, 0.5, 0.6, 2500, 2500.1, 10_000])
+    assert list(histogram) == [f"<={bound}" for bound in HISTOGRAM_BUCKETS_MS] + [">2500"]
+    assert histogram['<=0.5'] == 2
+    assert histogram['<=1'] == 1
+    assert histogram['<=2500'] == 1
+    assert histogram['>2500'] == 2
+    assert sum(histogram.values()) == 6
+
+def test_rate_zero_measures_latency_from_dispatch():
+    city_graph = initialize_sample_city()
+    events = generate_event_log(city_graph, 300, duration=60)
+    result = ReplayEngine(city_graph, concurrency=1, rate=0).run(events)
+
+    assert result['errors'] == 0
+    assert result['dispatch_lag_ms'] is None
+    # Measured from the start of the replay, p90 would be most of the wall time
+    assert result['latency_ms']['p50'] < result['service_ms']['p50'] + 2
+    assert result['latency_ms']['p90'] < result['wall_seconds'] * 1000 / 4
+
+def test_searches_start_before_later_updates(monkeypatch):
+    seen_reports = []
+
+    def recording_dijkstra(city_graph, *args):
+        seen_reports.append(dict(city_graph.user_reports))
+        time.sleep(0.05)
+
+    monkeypatch.setattr(replay, 'dijkstra', recording_dijkstra)
+    events = [
+        {'t': 0, 'type': 'route', 'start': 'Downtown', 'end': 'Airport'},
+        {'t': 5, 'type': 'report', 'from': 'Downtown', 'to': 'University', 'delay': 4},
+    ]
+    result = ReplayEngine(initialize_sample_city(), concurrency=1, rate=0).run(events)
+
+    assert seen_reports == [{}]
+    assert result['staleness']['stale_fraction'] == 1.0
+    assert result['staleness']['max_versions_behind'] == 1
+    assert result['staleness']['stale_ms']['max'] > 0
+
+def test_main_rejects_bad_concurrency_and_rate(tmp_path, capsys):
+    path = _write_log(tmp_path, [{'t': 0, 'type': 'route', 'start': 'Downtown', 'end': 'Airport'}])
+    for arguments in (['--concurrency', '0'], ['--rate', '-1']):
+        with pytest.raises(SystemExit):
+            replay.main(['run', path, *arguments, '--output', str(tmp_path / 'out.json')])
+        assert arguments[0] in capsys.readouterr().err
+
+def test_answers_overtaken_by_an_update_are_stale(monkeypatch):
+    monkeypatch.setattr(replay, 'dijkstra', lambda *args: time.sleep(0.1))
+    events = [
+        {'t': 0.0, 'type': 'route', 'start': 'Downtown', 'end': 'Airport'},
+        {'t': 0.02, 'type': 'report', 'from': 'Downtown', 'to': 'University', 'delay': 4},
+    ]
+    result = ReplayEngine(initialize_sample_city(), concurrency=1, rate=1).run(events)
+
+    assert result['updates'] == {'report': 1, 'congestion': 0, 'rejected': 0}
+    assert result['staleness']['stale_fraction'] == 1.0
+    assert result['staleness']['max_versions_behind'] == 1
+    # The report landed about 20 ms into a 100 ms search
+    assert 50 < result['staleness']['stale_ms']['max'] < result['latency_ms']['max']
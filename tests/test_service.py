@@ -0,0 +1,165 @@
+import asyncio
+import json
+from graph.algorithms import dijkstra, yen_k_shortest_paths
+from service.batching import RouteBatcher
+from service.server import RoutingService
+
+async def _request(port, method, path, body=None, raw_body=None, headers=None):
+    """Send one HTTP request to the local service and return (status, JSON body)"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = raw_body if raw_body is not None else (json.dumps(body).encode() if body is not None else b'')
+    header_lines = headers if headers is not None else [f"Content-Length: {len(data)}"]
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n".encode()
+        + "".join(f"{line}\r\n" for line in header_lines).encode()
+        + b"\r\n" + data
+    )
+    await writer.drain()
+    response = await asyncio.wait_for(reader.read(), timeout=5)
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(payload)
+
+def _run_with_service(scenario, window=0.02):
+    """Start a service on a free localhost port and run `scenario(service, port)`"""
+    async def main():
+        service = RoutingService(window=window)
+        server = await service.start(port=0)
+        try:
+            return await scenario(service, server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(main())
+
+def test_same_origin_queries_share_one_search():
+    async def scenario(service, port):
+        ends = ['Airport', 'Stadium', 'Hospital', 'Airport']
+        responses = await asyncio.gather(*(
+            _request(port, 'POST', '/route', {'start': 'Downtown', 'end': end}) for end in ends
+        ))
+        return service, ends, responses
+
+    service, ends, responses = _run_with_service(scenario)
+    assert service.batcher.stats == {'queries': 4, 'searches': 1, 'batches': 1}
+    for end, (status, body) in zip(ends, responses):
+        assert status == 200
+        expected = dijkstra(service.city_graph, 'Downtown', end)
+        assert body['routes'][0]['path'] == expected.path
+        assert body['routes'][0]['cost'] == expected.cost
+
+def test_invalid_requests_return_400():
+    async def scenario(service, port):
+        bad_payloads = [
+            {'start': 'Downtown', 'end': 'Mars'},
+            {'start': 'Downtown', 'end': 'Airport', 'k': 'three'},
+            {'start': 'Downtown', 'end': 'Airport', 'k': 0},
+            {'start': 'Downtown', 'end': 'Airport', 'k': 11},
+            {'start': 'Downtown', 'end': 'Airport', 'k': 2.5},
+            {'start': 'Downtown', 'end': 'Airport', 'k': '3'},
+            {'start': 'Downtown', 'end': 'Airport', 'k': True},
+            {'start': 'Downtown', 'end': 'Airport', 'k': 100000},
+            {'start': 'Downtown', 'end': 'Airport', 'time_of_day': 'noon'},
+            {'start': 'Downtown', 'end': 'Airport', 'time_of_day': ['x']},
+            {'start': 'Downtown', 'end': 'Airport', 'use_case': 'Tank'},
+        ]
+        responses = [await _request(port, 'POST', '/route', payload) for payload in bad_payloads]
+        responses.append(await _request(port, 'POST', '/route', raw_body=b'{not json'))
+        responses.append(await _request(port, 'POST', '/route', raw_body=b'[]'))
+        responses.append(await _request(port, 'POST', '/route', headers=['Content-Length: abc']))
+        responses.append(await _request(port, 'POST', '/report', {'from': 'Downtown', 'to': 'Airport', 'delay': 5}))
+        for delay in [float('nan'), float('inf'), -3, '5', True, None]:
+            responses.append(await _request(
+                port, 'POST', '/report', {'from': 'Downtown', 'to': 'University', 'delay': delay}
+            ))
+        for active in ['false', 0, None]:
+            responses.append(await _request(
+                port, 'POST', '/congestion', {'from': 'Downtown', 'to': 'University', 'active': active}
+            ))
+        return service, responses
+
+    service, responses = _run_with_service(scenario)
+    for status, body in responses:
+        assert status == 400
+        assert body['error']
+    assert not service.city_graph.user_reports
+    assert not service.city_graph.congestion_zones
+
+
+def test_invalid_request_does_not_stall_its_batch():
+    async def scenario(service, port):
+        return await asyncio.gather(
+            _request(port, 'POST', '/route', {'start': 'Downtown', 'end': 'Airport', 'time_of_day': ['x']}),
+            _request(port, 'POST', '/route', {'start': 'Downtown', 'end': 'Airport'}),
+        )
+
+    (bad_status, _), (good_status, good_body) = _run_with_service(scenario)
+    assert bad_status == 400
+    assert good_status == 200
+    assert good_body['routes']
+
+def test_unhashable_query_fails_alone():
+    async def main():
+        batcher = RouteBatcher(RoutingService().city_graph, window=0.01)
+        return batcher, await asyncio.wait_for(asyncio.gather(
+            batcher.route('Downtown', 'Airport', time_of_day=['x']),
+            batcher.route('Downtown', 'Airport'),
+            return_exceptions=True
+        ), timeout=5)
+
+    batcher, (bad, good) = asyncio.run(main())
+    assert isinstance(bad, TypeError)
+    version, routes = good
+    assert routes[0].path == dijkstra(batcher.city_graph, 'Downtown', 'Airport').path
+
+def test_identical_k_shortest_queries_share_one_search():
+    async def scenario(service, port):
+        query = {'start': 'Downtown', 'end': 'Airport', 'k': 3, 'time_of_day': 'evening'}
+        return service, await asyncio.gather(*(
+            _request(port, 'POST', '/route', query) for _ in range(3)
+        ))
+
+    service, responses = _run_with_service(scenario)
+    assert service.batcher.stats == {'queries': 3, 'searches': 1, 'batches': 1}
+    expected = yen_k_shortest_paths(service.city_graph, 'Downtown', 'Airport', 3, 'evening')
+    for status, body in responses:
+        assert status == 200
+        assert [route['path'] for route in body['routes']] == [route.path for route in expected]
+
+def test_report_and_congestion_update_the_graph():
+    async def scenario(service, port):
+        responses = [
+            await _request(port, 'POST', '/report', {'from': 'Downtown', 'to': 'Market Square', 'delay': 20}),
+            await _request(port, 'POST', '/congestion', {'from': 'Downtown', 'to': 'Central Park'}),
+        ]
+        routed = await _request(port, 'POST', '/route', {'start': 'Downtown', 'end': 'Shopping Mall'})
+        responses.append(await _request(
+            port, 'POST', '/congestion', {'from': 'Downtown', 'to': 'Central Park', 'active': False}
+        ))
+        return service, responses, routed
+
+    service, (report, added, removed), routed = _run_with_service(scenario)
+    assert report == (200, {'graph_version': report[1]['graph_version']})
+    assert added[0] == 200 and added[1]['changed']
+    assert removed[0] == 200 and removed[1]['changed']
+    assert removed[1]['graph_version'] > added[1]['graph_version'] > report[1]['graph_version']
+    assert service.city_graph.user_reports[('Downtown', 'Market Square')] == 20
+    assert not service.city_graph.congestion_zones
+
+    # The 20 minute report makes the direct road slower than going via University
+    status, body = routed
+    assert status == 200
+    assert body['graph_version'] == added[1]['graph_version']
+    assert body['routes'][0]['path'] == dijkstra(service.city_graph, 'Downtown', 'Shopping Mall').path
+    assert body['routes'][0]['path'][1] != 'Market Square'
+
+def test_search_failure_returns_500():
+    async def scenario(service, port):
+        async def failing_route(*args):
+            raise KeyError('noon')
+        service.batcher.route = failing_route
+        return await _request(port, 'POST', '/route', {'start': 'Downtown', 'end': 'Airport'})
+
+    status, body = _run_with_service(scenario)
+    assert status == 500
+    assert body == {'error': "Internal server error"}
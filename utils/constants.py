@@ -40,4 +40,6 @@ TIME_WEIGHTS = {
     'afternoon': 1.2,
     'evening': 1.8,
     'night': 0.9
-}
\ No newline at end of file
+}
+
+USE_CASES = ["Ambulance", "Delivery Truck", "Cyclist"]
\ No newline at end of file
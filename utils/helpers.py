@@ -1,5 +1,6 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Optional
 from graph.core import CityGraph
+from graph.models import RouteResult
 from utils.constants import SAMPLE_INTERSECTIONS, SAMPLE_ROADS, NODE_COORDS, TIME_WEIGHTS
 
 def initialize_sample_city() -> CityGraph:
@@ -27,25 +28,21 @@ def initialize_sample_city() -> CityGraph:
 
 def generate_route_summary(
     city_graph: CityGraph,
-    path: List[str],
+    route: RouteResult,
     time_of_day: Optional[str] = None,
     use_case: Optional[str] = None
 ) -> str:
-    """Generate a summary of the route"""
+    """Generate a summary of the route from the costs computed during the search"""
+    path = route.path
     if not path:
         return "No path found"
     
     summary = f"Route from {path[0]} to {path[-1]}:\n\n"
-    total_time = 0
     
-    for i in range(len(path)-1):
-        u = path[i]
-        v = path[i+1]
-        weight = _calculate_route_segment_weight(city_graph, u, v, time_of_day, use_case)
+    for u, v, weight in route.segments():
         summary += f"{u} → {v}: {weight:.1f} minutes\n"
-        total_time += weight
     
-    summary += f"\nTotal Travel Time: {total_time:.1f} minutes"
+    summary += f"\nTotal Travel Time: {route.cost:.1f} minutes"
     
     if use_case:
         summary += f"\nUse Case: {use_case}"
@@ -54,30 +51,12 @@ def generate_route_summary(
     
     # Check for traffic alerts
     alert_edges = [
-        f"{path[i]}-{path[i+1]}" 
-        for i in range(len(path)-1) 
-        if (path[i], path[i+1]) in city_graph.traffic_alerts
+        f"{u}-{v}" 
+        for u, v, _ in route.segments() 
+        if (u, v) in city_graph.traffic_alerts
     ]
     
     if alert_edges:
         summary += "\n\n🚨 Traffic Alerts on: " + ", ".join(alert_edges)
     
     return summary
-
-def _calculate_route_segment_weight(
-    city_graph: CityGraph,
-    u: str,
-    v: str,
-    time_of_day: Optional[str],
-    use_case: Optional[str]
-) -> float:
-    """Calculate weight for a route segment considering all factors"""
-    weight = city_graph.graph[u][v]['weight']
-    
-    if time_of_day and (u, v) in city_graph.time_weights:
-        weight = city_graph.time_weights[(u, v)][time_of_day]
-    
-    if (u, v) in city_graph.user_reports:
-        weight += city_graph.user_reports[(u, v)]
-    
-    return weight
\ No newline at end of file
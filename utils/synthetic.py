@@ -0,0 +1,130 @@
+import math
+import random
+from typing import Dict, List, Tuple
+from graph.core import CityGraph
+from utils.constants import TIME_WEIGHTS
+
+CITY_LAYOUTS = ('grid', 'radial', 'random_planar')
+
+# Synthetic cities are laid out around the sample city's centre
+BASE_COORDS = (40.7170, -74.0070)
+BLOCK_DEGREES = 0.002
+KM_PER_DEGREE = 111.0
+
+def generate_city(
+    layout: str,
+    num_intersections: int,
+    seed: int = 0,
+    report_fraction: float = 0.01,
+    congestion_fraction: float = 0.01
+) -> CityGraph:
+    """Generate a synthetic city with coordinates, time weights, reports and congestion
+
+    Layouts:
+        grid          - rectangular street grid
+        radial        - ring roads joined by spokes around a centre
+        random_planar - jittered grid with random diagonals and missing blocks
+
+    The intersection count is rounded up to fill the last row or ring. The same
+    seed always produces the same city.
+    """
+    if layout not in CITY_LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}, expected one of {CITY_LAYOUTS}")
+    if num_intersections < 2:
+        raise ValueError("A city needs at least 2 intersections")
+
+    rng = random.Random(seed)
+    builders = {
+        'grid': _grid_layout,
+        'radial': _radial_layout,
+        'random_planar': _random_planar_layout,
+    }
+    coords, roads = builders[layout](num_intersections, rng)
+
+    city_graph = CityGraph()
+    city_graph.graph.add_nodes_from(coords)
+    city_graph.node_coords = coords
+
+    for u, v in roads:
+        weight = _travel_minutes(coords[u], coords[v], rng.uniform(20, 60))
+        city_graph.add_edge(u, v, weight)
+        jitter = rng.uniform(0.9, 1.1)
+        city_graph.add_time_weight(u, v, {
+            time: weight * factor * jitter
+            for time, factor in TIME_WEIGHTS.items()
+        })
+
+    for u, v in rng.sample(roads, int(len(roads) * report_fraction)):
+        weight = city_graph.graph[u][v]['weight']
+        city_graph.add_user_report(u, v, round(rng.uniform(1, 3) * weight, 1))
+
+    for u, v in rng.sample(roads, int(len(roads) * congestion_fraction)):
+        city_graph.add_congestion_zone(u, v)
+
+    return city_graph
+
+def _travel_minutes(a: Tuple[float, float], b: Tuple[float, float], speed_kmh: float) -> float:
+    """Travel time along a straight road at the given speed"""
+    km = math.hypot(a[0] - b[0], a[1] - b[1]) * KM_PER_DEGREE
+    return round(km / speed_kmh * 60, 2)
+
+def _grid_layout(n: int, rng: random.Random) -> Tuple[Dict[str, Tuple[float, float]], List[Tuple[str, str]]]:
+    """Rectangular grid of roughly sqrt(n) x sqrt(n) intersections"""
+    cols = math.ceil(math.sqrt(n))
+    rows = math.ceil(n / cols)
+    coords = {
+        f"G{r}-{c}": (BASE_COORDS[0] + r * BLOCK_DEGREES, BASE_COORDS[1] + c * BLOCK_DEGREES)
+        for r in range(rows) for c in range(cols)
+    }
+    roads = []
+    for r in range(rows):
+        for c in range(cols):
+            if c + 1 < cols:
+                roads.append((f"G{r}-{c}", f"G{r}-{c+1}"))
+            if r + 1 < rows:
+                roads.append((f"G{r}-{c}", f"G{r+1}-{c}"))
+    return coords, roads
+
+def _radial_layout(n: int, rng: random.Random) -> Tuple[Dict[str, Tuple[float, float]], List[Tuple[str, str]]]:
+    """Concentric ring roads joined by spokes to a central intersection"""
+    spokes = max(8, int(math.sqrt(n)))
+    rings = math.ceil((n - 1) / spokes)
+    coords = {"Centre": BASE_COORDS}
+    roads = []
+    for ring in range(1, rings + 1):
+        for s in range(spokes):
+            angle = 2 * math.pi * s / spokes
+            node = f"R{ring}-{s}"
+            coords[node] = (
+                BASE_COORDS[0] + ring * BLOCK_DEGREES * math.sin(angle),
+                BASE_COORDS[1] + ring * BLOCK_DEGREES * math.cos(angle)
+            )
+            roads.append((node, f"R{ring}-{(s + 1) % spokes}"))
+            roads.append((node, f"R{ring-1}-{s}" if ring > 1 else "Centre"))
+    return coords, roads
+
+def _random_planar_layout(n: int, rng: random.Random) -> Tuple[Dict[str, Tuple[float, float]], List[Tuple[str, str]]]:
+    """Jittered grid with one random diagonal in some blocks and some streets removed
+
+    Jitter stays under a quarter block so every block remains convex and a
+    single diagonal per block cannot cross another road. Vertical streets and
+    the first row are always kept, which keeps the city connected.
+    """
+    coords, grid_roads = _grid_layout(n, rng)
+    jitter = BLOCK_DEGREES / 4
+    coords = {
+        node: (lat + rng.uniform(-jitter, jitter), lon + rng.uniform(-jitter, jitter))
+        for node, (lat, lon) in coords.items()
+    }
+    roads = [
+        (u, v) for u, v in grid_roads
+        if u.split('-')[0] != v.split('-')[0] or u.startswith('G0-') or rng.random() > 0.2
+    ]
+    for node in coords:
+        r, c = (int(part) for part in node[1:].split('-'))
+        if rng.random() < 0.3 and f"G{r+1}-{c+1}" in coords:
+            if rng.random() < 0.5:
+                roads.append((node, f"G{r+1}-{c+1}"))
+            else:
+                roads.append((f"G{r}-{c+1}", f"G{r+1}-{c}"))
+    return coords, roads